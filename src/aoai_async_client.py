@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import random
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Optional, Sequence, Tuple
 
-from openai import AsyncOpenAI, BadRequestError
+import httpx
+from openai import APIStatusError, AsyncOpenAI, BadRequestError, DefaultAsyncHttpxClient, RateLimitError
 
-from prompts import build_prompts
+from circuit_breaker import AsyncCircuitBreaker, CircuitOpen
+from prompts import build_batch_prompts, build_prompts
 
 
 @dataclass(frozen=True)
@@ -22,9 +25,32 @@ class TranslateResult:
     error_message: str = ""
 
 
+# 高い --concurrency でも接続を閉じずに使い回す（全接続を keep-alive 対象にする）
+_HTTP_LIMITS = httpx.Limits(max_connections=256, max_keepalive_connections=256)
+# 翻訳 1 リクエスト全体のタイムアウトは translate_one_async 側（asyncio.timeout）で管理する。
+# read は asyncio.timeout を使わない Batch API 呼び出しが無期限に止まらないための上限。
+_HTTP_TIMEOUT = httpx.Timeout(connect=10.0, read=600.0, write=30.0, pool=None)
+
+_clients: dict[Tuple[str, str], AsyncOpenAI] = {}
+
+# リトライ時のジッター用（プロセス内で 1 つ。テストではシードを固定できる）
+_JITTER = random.Random()
+
+# usage の形を一度確認したら True（以降は直接参照する）
+_USAGE_SHAPE_VERIFIED = False
+
+# Retry-After がこれを超える 429 は待たずに rate_limited_long として返す
+RETRY_AFTER_CAP_SEC = 120.0
+
+
 def make_async_client(endpoint: str, api_key: str) -> AsyncOpenAI:
     """Azure OpenAI 用の Async クライアントを生成します。
 
+    HTTP/2 を有効にした httpx クライアントを使い、少数のソケット上に
+    リクエストを多重化します（TLS ハンドシェイクの繰り返しを避けるため）。
+    同じ endpoint/api_key では同じクライアントを返します。
+    クライアントはイベントループに紐づくため、1 つの asyncio.run の中で使う前提です。
+
     Args:
         endpoint: Azure OpenAI のエンドポイント（https://...openai.azure.com）。
         api_key: API キー。
@@ -32,8 +58,14 @@ def make_async_client(endpoint: str, api_key: str) -> AsyncOpenAI:
     Returns:
         AsyncOpenAI: 初期化済みクライアント。
     """
-    base_url = endpoint.rstrip("/") + "/openai/v1/"
-    return AsyncOpenAI(api_key=api_key, base_url=base_url)
+    key = (endpoint, api_key)
+    client = _clients.get(key)
+    if client is None:
+        base_url = endpoint.rstrip("/") + "/openai/v1/"
+        http_client = DefaultAsyncHttpxClient(http2=True, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+        client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+        _clients[key] = client
+    return client
 
 
 def _extract_error_code_from_bad_request(exc: BadRequestError) -> str:
@@ -67,60 +99,119 @@ def _is_content_filter_error(exc: Exception) -> bool:
     return _extract_error_code_from_bad_request(exc) == "content_filter"
 
 
-async def translate_one_async(
+def _usage_tokens(resp) -> Tuple[int, int]:
+    """レスポンスから使用トークン数を取り出します。
+
+    最初に usage の形（int の input_tokens/output_tokens）を確認できたら、
+    以降は getattr/int() のガードを省いて直接参照します。
+
+    Args:
+        resp: responses.create の戻り値。
+
+    Returns:
+        Tuple[int, int]: (input_tokens, output_tokens)
+    """
+    global _USAGE_SHAPE_VERIFIED
+
+    if _USAGE_SHAPE_VERIFIED:
+        usage = resp.usage
+        if usage is not None:
+            return usage.input_tokens, usage.output_tokens
+
+    usage = getattr(resp, "usage", None)
+    input_tokens = getattr(usage, "input_tokens", None) if usage else None
+    output_tokens = getattr(usage, "output_tokens", None) if usage else None
+    if isinstance(input_tokens, int) and isinstance(output_tokens, int):
+        _USAGE_SHAPE_VERIFIED = True
+        return input_tokens, output_tokens
+    return int(input_tokens or 0), int(output_tokens or 0)
+
+
+def _retry_after_sec(exc: Exception) -> Optional[float]:
+    """429 応答の Retry-After ヘッダ（秒）を取得します。
+
+    Args:
+        exc: 例外。
+
+    Returns:
+        Optional[float]: 待機秒数。429 でない・ヘッダが無い・秒数で解釈できない場合は None。
+    """
+    if not isinstance(exc, APIStatusError) or exc.status_code != 429:
+        return None
+    value = exc.response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        # HTTP-date 形式は扱わない（通常のバックオフに任せる）
+        return None
+
+
+def _is_overload_error(exc: Exception) -> bool:
+    """レート制限（429）またはサーバーエラー（5xx）か判定します。
+
+    Args:
+        exc: 例外。
+
+    Returns:
+        bool: 429/5xx の場合 True。
+    """
+    if isinstance(exc, RateLimitError):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+async def _create_with_retry(
     client: AsyncOpenAI,
     deployment: str,
-    source_text: str,
-    context_name: str,
-    target_language: str,
+    system_prompt: str,
+    user_prompt: str,
     *,
-    max_retries: int = 6,
-    timeout_sec: float = 60.0,
+    max_retries: int,
+    timeout_sec: float,
+    breaker: Optional[AsyncCircuitBreaker] = None,
 ) -> TranslateResult:
-    """1メッセージを指定言語へ翻訳します（非同期）。
-
-    方針:
-    - content_filter の場合は例外にせず ok=False で返します（全体を止めないため）。
-    - それ以外の一時的な失敗（429/5xx/ネットワーク等）は指数バックオフでリトライします。
+    """Responses API を 1 回呼び出します（一時的な失敗はリトライ）。
 
     Args:
         client: AsyncOpenAI クライアント。
-        deployment: Azure OpenAI のデプロイ名（例: gpt-4o-mini）。
-        source_text: 翻訳元の文字列。
-        context_name: Qt context 名。
-        target_language: 翻訳先言語（例: Japanese (ja_JP)）。
+        deployment: Azure OpenAI のデプロイ名。
+        system_prompt: SYSTEM プロンプト。
+        user_prompt: USER プロンプト。
         max_retries: 最大リトライ回数。
         timeout_sec: 1リクエストのタイムアウト秒。
+        breaker: サーキットブレーカー（None なら使わない）。
 
     Returns:
-        TranslateResult: 翻訳結果（ok=False の場合は text は空、error_code が入る）。
-    """
-    system_prompt, user_prompt = build_prompts(
-        source_text=source_text,
-        context_name=context_name,
-        target_language=target_language,
-    )
+        TranslateResult: 出力テキストと使用トークン
+            （content_filter / circuit_open の場合は ok=False）。
 
+    Raises:
+        Exception: リトライしても失敗した場合、最後の例外。
+    """
     last_exc: Optional[Exception] = None
 
     for attempt in range(max_retries + 1):
         try:
-            resp = await asyncio.wait_for(
-                client.responses.create(
+            if breaker is not None:
+                await breaker.before_call()
+
+            # wait_for と違い 1 リクエストごとに Task を生成しない
+            async with asyncio.timeout(timeout_sec):
+                resp = await client.responses.create(
                     model=deployment,  # Azure は deployment 名を model に渡す
                     input=[
                         {"role": "system", "content": system_prompt},
                         {"role": "user", "content": user_prompt},
                     ],
-                ),
-                timeout=timeout_sec,
-            )
+                )
 
             text = (resp.output_text or "").strip()
+            input_tokens, output_tokens = _usage_tokens(resp)
 
-            usage = getattr(resp, "usage", None)
-            input_tokens = int(getattr(usage, "input_tokens", 0) or 0) if usage else 0
-            output_tokens = int(getattr(usage, "output_tokens", 0) or 0) if usage else 0
+            if breaker is not None:
+                await breaker.record_success()
 
             return TranslateResult(
                 ok=True,
@@ -130,8 +221,27 @@ async def translate_one_async(
             )
 
         except Exception as exc:
+            # タイムアウト（TimeoutError）も一時的な失敗としてリトライする
             last_exc = exc
 
+            # fail_fast のブレーカーが開いている間は呼び出さずに未翻訳で返す
+            if isinstance(exc, CircuitOpen):
+                return TranslateResult(
+                    ok=False,
+                    text="",
+                    input_tokens=0,
+                    output_tokens=0,
+                    error_code="circuit_open",
+                    error_message=str(exc),
+                )
+
+            if breaker is not None:
+                if _is_overload_error(exc):
+                    await breaker.record_failure()
+                elif isinstance(exc, APIStatusError):
+                    # 429/5xx 以外の応答はサービス自体は健全とみなす
+                    await breaker.record_success()
+
             # content_filter はスキップ（全体停止しない）
             if _is_content_filter_error(exc):
                 return TranslateResult(
@@ -143,12 +253,211 @@ async def translate_one_async(
                     error_message=str(exc),
                 )
 
+            # Retry-After が長すぎる場合は待たずに諦める（例: 86400 秒）
+            retry_after = _retry_after_sec(exc)
+            if retry_after is not None and retry_after > RETRY_AFTER_CAP_SEC:
+                return TranslateResult(
+                    ok=False,
+                    text="",
+                    input_tokens=0,
+                    output_tokens=0,
+                    error_code="rate_limited_long",
+                    error_message=f"Retry-After {retry_after:.0f}s: {exc}",
+                )
+
             # 最終試行なら抜けて最後に例外
             if attempt >= max_retries:
                 break
 
-            # 指数バックオフ + ジッター（衝突回避）
-            backoff = min(30.0, (2 ** attempt) * 0.5) + random.uniform(0, 0.25)
-            await asyncio.sleep(backoff)
+            # 指数バックオフ（Retry-After があればそれ以上待つ）+ ジッター（衝突回避）
+            backoff = min(30.0, (2 ** attempt) * 0.5)
+            if retry_after is not None:
+                backoff = max(retry_after, backoff)
+            await asyncio.sleep(backoff + _JITTER.random() * 0.25)
+
+    raise last_exc if last_exc else RuntimeError("responses.create failed")
+
+
+async def translate_one_async(
+    client: AsyncOpenAI,
+    deployment: str,
+    source_text: str,
+    context_name: str,
+    target_language: str,
+    *,
+    max_retries: int = 6,
+    timeout_sec: float = 60.0,
+    breaker: Optional[AsyncCircuitBreaker] = None,
+) -> TranslateResult:
+    """1メッセージを指定言語へ翻訳します（非同期）。
+
+    方針:
+    - content_filter の場合は例外にせず ok=False で返します（全体を止めないため）。
+    - それ以外の一時的な失敗（429/5xx/ネットワーク等）は指数バックオフでリトライします。
+    - breaker が open の間は half_open のプローブを通せるまで待ちます
+      （fail_fast のブレーカーなら API を呼ばず、error_code="circuit_open" で返します）。
+    - 429 の Retry-After が RETRY_AFTER_CAP_SEC を超える場合は待たずに
+      error_code="rate_limited_long" で返します。
+
+    Args:
+        client: AsyncOpenAI クライアント。
+        deployment: Azure OpenAI のデプロイ名（例: gpt-4o-mini）。
+        source_text: 翻訳元の文字列。
+        context_name: Qt context 名。
+        target_language: 翻訳先言語（例: Japanese (ja_JP)）。
+        max_retries: 最大リトライ回数。
+        timeout_sec: 1リクエストのタイムアウト秒。
+        breaker: サーキットブレーカー（None なら使わない）。
+
+    Returns:
+        TranslateResult: 翻訳結果（ok=False の場合は text は空、error_code が入る）。
+    """
+    system_prompt, user_prompt = build_prompts(
+        source_text=source_text,
+        context_name=context_name,
+        target_language=target_language,
+    )
+    return await _create_with_retry(
+        client,
+        deployment,
+        system_prompt,
+        user_prompt,
+        max_retries=max_retries,
+        timeout_sec=timeout_sec,
+        breaker=breaker,
+    )
+
+
+def _parse_batch_output(text: str, ids: Sequence[int]) -> Optional[dict[int, str]]:
+    """まとめ翻訳の出力（JSON 配列）を id → 訳文 に変換します。
+
+    Args:
+        text: モデルの出力テキスト。
+        ids: 入力した id 一覧。
+
+    Returns:
+        Optional[dict[int, str]]: 全 id が揃っていれば辞書、解析できなければ None。
+    """
+    # ```json ... ``` で囲まれて返ることがあるため外す
+    body = text.strip()
+    if body.startswith("```"):
+        body = body.strip("`").strip()
+        if body.startswith("json"):
+            body = body[4:]
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(data, list):
+        return None
+
+    out: dict[int, str] = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            return None
+        translation = entry.get("translation")
+        try:
+            out[int(entry.get("id"))] = translation.strip()
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    if any(i not in out for i in ids):
+        return None
+    return out
+
+
+async def translate_batch_async(
+    client: AsyncOpenAI,
+    deployment: str,
+    items: Sequence[Tuple[int, str, str]],
+    target_language: str,
+    *,
+    max_retries: int = 6,
+    timeout_sec: float = 60.0,
+    breaker: Optional[AsyncCircuitBreaker] = None,
+    acquire: Optional[Callable[[Sequence[str]], Awaitable[None]]] = None,
+) -> dict[int, TranslateResult]:
+    """複数メッセージを 1 リクエストでまとめて翻訳します（非同期）。
+
+    方針:
+    - 出力は id 付きの JSON 配列で受け取り、id で元のメッセージに戻します。
+    - JSON が解析できない・id が欠けている・content_filter の場合は
+      translate_one_async で 1 件ずつ翻訳し直します（1 件の問題でまとめて失敗させないため）。
+    - それ以外の失敗（circuit_open / rate_limited_long 等）は 1 件ずつにしても同じ結果になるため、
+      まとめリクエストの結果をそのまま全 id に返します。
+    - 使用トークンはまとめた分を先頭メッセージの結果に計上します。
+
+    Args:
+        client: AsyncOpenAI クライアント。
+        deployment: Azure OpenAI のデプロイ名。
+        items: (id, context_name, source_text) の一覧。
+        target_language: 翻訳先言語（例: Japanese (ja_JP)）。
+        max_retries: 最大リトライ回数。
+        timeout_sec: 1リクエストのタイムアウト秒。
+        breaker: サーキットブレーカー（None なら使わない）。
+        acquire: 1 件ずつのフォールバック要求の前に、その source_text の一覧で呼ばれる
+            流量制御用のコールバック（まとめリクエスト分は呼び出し側で取得済みとする）。
 
-    raise last_exc if last_exc else RuntimeError("translate_one_async failed")
+    Returns:
+        dict[int, TranslateResult]: id → 翻訳結果。
+    """
+    if len(items) > 1:
+        system_prompt, user_prompt = build_batch_prompts(items=items, target_language=target_language)
+        result = await _create_with_retry(
+            client,
+            deployment,
+            system_prompt,
+            user_prompt,
+            max_retries=max_retries,
+            timeout_sec=timeout_sec,
+            breaker=breaker,
+        )
+        ids = [i for i, _, _ in items]
+        if not result.ok and result.error_code != "content_filter":
+            return {
+                i: result if n == 0 else replace(result, input_tokens=0, output_tokens=0)
+                for n, i in enumerate(ids)
+            }
+        translations = _parse_batch_output(result.text, ids) if result.ok else None
+        if translations is not None:
+            results: dict[int, TranslateResult] = {}
+            for n, i in enumerate(ids):
+                results[i] = TranslateResult(
+                    ok=True,
+                    text=translations[i],
+                    input_tokens=result.input_tokens if n == 0 else 0,
+                    output_tokens=result.output_tokens if n == 0 else 0,
+                )
+            return results
+
+        # 失敗したまとめリクエスト分のトークンも料金概算に含める
+        spent_input, spent_output = result.input_tokens, result.output_tokens
+    else:
+        spent_input, spent_output = 0, 0
+
+    # 1 件ずつにフォールバック
+    results = {}
+    for i, context_name, source_text in items:
+        # 1 件だけの呼び出しは、その要求自体を呼び出し側で取得済み
+        if acquire is not None and len(items) > 1:
+            await acquire([source_text])
+        one = await translate_one_async(
+            client,
+            deployment,
+            source_text,
+            context_name,
+            target_language,
+            max_retries=max_retries,
+            timeout_sec=timeout_sec,
+            breaker=breaker,
+        )
+        if spent_input or spent_output:
+            one = replace(
+                one,
+                input_tokens=one.input_tokens + spent_input,
+                output_tokens=one.output_tokens + spent_output,
+            )
+            spent_input, spent_output = 0, 0
+        results[i] = one
+    return results
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Optional, Sequence, Tuple
+
+import orjson
+from openai import AsyncOpenAI
+
+from aoai_async_client import TranslateResult
+from prompts import build_prompts
+
+BATCH_ENDPOINT = "/v1/responses"
+
+# 終了状態（これ以上ステータスが変わらない）
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _build_batch_jsonl(
+    deployment: str,
+    items: Sequence[Tuple[str, str]],
+    target_language: str,
+) -> bytes:
+    """Batch 入力用の JSONL を構築します。
+
+    custom_id には items 内のインデックス（0 始まり）を入れます。
+
+    Args:
+        deployment: Azure OpenAI のデプロイ名（Global Batch デプロイ）。
+        items: (context_name, source_text) の一覧。
+        target_language: 翻訳先言語（例: Japanese (ja_JP)）。
+
+    Returns:
+        bytes: JSONL（UTF-8）。
+    """
+    lines: list[bytes] = []
+    for i, (context_name, source_text) in enumerate(items):
+        system_prompt, user_prompt = build_prompts(
+            source_text=source_text,
+            context_name=context_name,
+            target_language=target_language,
+        )
+        lines.append(
+            orjson.dumps(
+                {
+                    "custom_id": f"{i}",
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": deployment,
+                        "input": [
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                    },
+                },
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+        )
+    return b"".join(lines)
+
+
+def _output_text(body: dict[str, Any]) -> str:
+    """Responses API のレスポンス本文（JSON）から出力テキストを取り出します。
+
+    SDK の resp.output_text 相当を、生の JSON に対して行います。
+
+    Args:
+        body: レスポンス本文。
+
+    Returns:
+        str: 出力テキスト（前後空白除去済み）。
+    """
+    parts: list[str] = []
+    for out in body.get("output") or []:
+        if out.get("type") != "message":
+            continue
+        for content in out.get("content") or []:
+            if content.get("type") == "output_text":
+                parts.append(content.get("text") or "")
+    return "".join(parts).strip()
+
+
+def _parse_result_line(line: str) -> Tuple[int, TranslateResult]:
+    """Batch 出力（またはエラー）ファイルの 1 行を TranslateResult に変換します。
+
+    Args:
+        line: JSONL の 1 行。
+
+    Returns:
+        Tuple[int, TranslateResult]: (items 内のインデックス, 結果)
+    """
+    data = orjson.loads(line)
+    index = int(data["custom_id"])
+
+    response = data.get("response") or {}
+    body = response.get("body") or {}
+    status_code = int(response.get("status_code") or 0)
+
+    if status_code == 200 and not data.get("error"):
+        usage = body.get("usage") or {}
+        return index, TranslateResult(
+            ok=True,
+            text=_output_text(body),
+            input_tokens=int(usage.get("input_tokens") or 0),
+            output_tokens=int(usage.get("output_tokens") or 0),
+        )
+
+    err = body.get("error") or data.get("error") or {}
+    return index, TranslateResult(
+        ok=False,
+        text="",
+        input_tokens=0,
+        output_tokens=0,
+        error_code=str(err.get("code") or f"http_{status_code}"),
+        error_message=str(err.get("message") or ""),
+    )
+
+
+async def submit_batch(
+    client: AsyncOpenAI,
+    deployment: str,
+    items: Sequence[Tuple[str, str]],
+    target_language: str,
+) -> str:
+    """翻訳対象を 1 つの Batch ジョブとして投入します。
+
+    Args:
+        client: AsyncOpenAI クライアント。
+        deployment: Azure OpenAI のデプロイ名（Global Batch デプロイ）。
+        items: (context_name, source_text) の一覧。
+        target_language: 翻訳先言語（例: Japanese (ja_JP)）。
+
+    Returns:
+        str: batch_id。
+    """
+    payload = _build_batch_jsonl(deployment, items, target_language)
+    input_file = await client.files.create(file=("batch_input.jsonl", payload), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+async def poll_batch(
+    client: AsyncOpenAI,
+    batch_id: str,
+    *,
+    poll_interval_sec: float = 30.0,
+) -> Any:
+    """Batch ジョブが終了状態になるまで待機します。
+
+    Args:
+        client: AsyncOpenAI クライアント。
+        batch_id: submit_batch が返した ID。
+        poll_interval_sec: ポーリング間隔（秒）。
+
+    Returns:
+        Batch: 終了状態の Batch オブジェクト。
+    """
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        done = f"{counts.completed + counts.failed}/{counts.total}" if counts else "-"
+        print(f"[batch] {batch_id} status={batch.status} done={done}")
+        if batch.status in _TERMINAL_STATUSES:
+            return batch
+        await asyncio.sleep(poll_interval_sec)
+
+
+async def fetch_results(client: AsyncOpenAI, batch_id: str) -> dict[int, TranslateResult]:
+    """終了した Batch ジョブの結果を取得します。
+
+    出力ファイルとエラーファイルの両方を読みます。
+    結果の無いインデックス（期限切れ等）は戻り値に含まれません。
+
+    Args:
+        client: AsyncOpenAI クライアント。
+        batch_id: submit_batch が返した ID。
+
+    Returns:
+        dict[int, TranslateResult]: items 内のインデックス → 結果。
+
+    Raises:
+        RuntimeError: 出力ファイルもエラーファイルも無く、ジョブ自体が失敗した場合。
+    """
+    batch = await client.batches.retrieve(batch_id)
+    file_ids: list[Optional[str]] = [batch.output_file_id, batch.error_file_id]
+    if not any(file_ids):
+        raise RuntimeError(f"Batch {batch_id} finished without results (status={batch.status}): {batch.errors}")
+
+    results: dict[int, TranslateResult] = {}
+    for file_id in file_ids:
+        if not file_id:
+            continue
+        content = await client.files.content(file_id)
+        for line in content.text.splitlines():
+            if not line.strip():
+                continue
+            index, result = _parse_result_line(line)
+            results[index] = result
+    return results
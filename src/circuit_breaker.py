@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class CircuitOpen(Exception):
+    """サーキットが開いているため呼び出しを行わなかったことを示します。"""
+
+
+class AsyncCircuitBreaker:
+    """連続した 429/5xx に対するサーキットブレーカー（非同期）です。
+
+    状態:
+    - closed: 通常どおり呼び出す。連続失敗が fail_threshold に達すると open へ。
+    - open: 呼び出しを待たせる（fail_fast なら CircuitOpen を送出する）。reset_sec 経過で half_open へ。
+    - half_open: 1 件だけ試行（プローブ）を通し、成功なら closed、失敗なら open へ戻す。
+      プローブの結果が reset_sec 以内に記録されなければ次のプローブを通す。
+    """
+
+    def __init__(self, fail_threshold: int = 5, reset_sec: float = 30.0, *, fail_fast: bool = False) -> None:
+        """ブレーカーを初期化します（closed から開始）。
+
+        Args:
+            fail_threshold: open にする連続失敗回数。
+            reset_sec: open から half_open に移るまでの秒数。
+            fail_fast: True なら open の間は待たずに CircuitOpen を送出する。
+        """
+        self.fail_threshold = fail_threshold
+        self.reset_sec = reset_sec
+        self.fail_fast = fail_fast
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._changed_at = time.monotonic()
+        # 状態変更を待っている呼び出し側に通知するため、ロックを兼ねた Condition を使う
+        self._cond = asyncio.Condition()
+
+    def _set_state(self, state: str) -> None:
+        """状態を変更し、変更時刻を記録します（_cond を保持した状態で呼ぶ）。"""
+        self.state = state
+        self._changed_at = time.monotonic()
+        self._cond.notify_all()
+
+    async def before_call(self) -> None:
+        """呼び出し前に状態を確認します。
+
+        open / half_open の間は、closed に戻るかプローブを通せるようになるまで待機します。
+
+        Returns:
+            None
+
+        Raises:
+            CircuitOpen: fail_fast で、呼び出しを行うべきでない場合。
+        """
+        async with self._cond:
+            while True:
+                if self.state == "closed":
+                    return
+                wait = self._changed_at + self.reset_sec - time.monotonic()
+                if wait <= 0:
+                    # open の待機時間が過ぎた（または前回のプローブが応答しない）→ プローブを 1 件通す
+                    self._set_state("half_open")
+                    return
+                if self.fail_fast:
+                    raise CircuitOpen(f"circuit is {self.state}")
+                try:
+                    async with asyncio.timeout(wait):
+                        await self._cond.wait()
+                except TimeoutError:
+                    pass
+
+    async def record_success(self) -> None:
+        """呼び出しの成功を記録します（closed に戻します）。
+
+        Returns:
+            None
+        """
+        async with self._cond:
+            self.consecutive_failures = 0
+            if self.state != "closed":
+                self._set_state("closed")
+
+    async def record_failure(self) -> None:
+        """429/5xx による失敗を記録します。
+
+        Returns:
+            None
+        """
+        async with self._cond:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or (
+                self.state == "closed" and self.consecutive_failures >= self.fail_threshold
+            ):
+                self._set_state("open")
@@ -2,20 +2,26 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
-import os
+import itertools
+import sys
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from io import BytesIO
 from pathlib import Path
-from typing import Iterable, Optional, Tuple
-import xml.etree.ElementTree as ET
+from typing import Iterable, Optional, Sequence, Tuple
 
+import lxml.etree as ET
+import orjson
 from dotenv import load_dotenv
 
-from aoai_async_client import make_async_client, translate_one_async
+from aoai_async_client import TranslateResult, make_async_client, translate_batch_async
+from aoai_batch_client import fetch_results, poll_batch, submit_batch
+from circuit_breaker import AsyncCircuitBreaker
+from config import load_azure_openai_config
 from pricing import UsageTotals, estimate_cost_usd, load_pricing_config
 from progress import ProgressReporter
-from qph_export import extract_phrases_from_ts, build_qph_xml, write_qph
+from ratelimit import AsyncTokenBucket
+from qph_export import PhraseArrays, extract_phrase_arrays, write_qph_arrays
 from ptl_export import export_ptl_from_ts
 
 # ローカル実行用（GitHub Actions では secrets/env が優先される）
@@ -24,7 +30,7 @@ load_dotenv()
 FAILED_LOG_PATH = Path("translate_failed.jsonl")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TsItem:
     """TS ファイル内の翻訳単位（message）を保持します。"""
 
@@ -34,24 +40,6 @@ class TsItem:
     translation_elem: ET.Element
 
 
-def _load_env_required(name: str) -> str:
-    """環境変数を必須として取得します。
-
-    Args:
-        name: 環境変数名。
-
-    Returns:
-        str: 値。
-
-    Raises:
-        SystemExit: 未設定の場合。
-    """
-    value = os.getenv(name, "").strip()
-    if not value:
-        raise SystemExit(f"Missing env var: {name}")
-    return value
-
-
 def _text(elem: Optional[ET.Element]) -> str:
     """XML要素のテキストを安全に取得します。
 
@@ -89,6 +77,8 @@ def _should_translate(translation_elem: ET.Element) -> bool:
     - translation type="unfinished" → 翻訳対象
     - それ以外 → 既に翻訳済みとして対象外
 
+    子要素（<numerusform> など）のテキストも訳文として扱います。
+
     Args:
         translation_elem: <translation> 要素。
 
@@ -97,7 +87,17 @@ def _should_translate(translation_elem: ET.Element) -> bool:
     """
     if translation_elem.get("type") == "unfinished":
         return True
-    return _text(translation_elem) == ""
+    # 多くは空なので、strip した文字列を作らずに判定する
+    text = translation_elem.text
+    if text and not text.isspace():
+        return False
+    # 子要素は最初に非空白テキストが見つかった時点で打ち切る
+    for sub in translation_elem.iterdescendants("*"):
+        if sub.text and not sub.text.isspace():
+            return False
+        if sub.tail and not sub.tail.isspace():
+            return False
+    return True
 
 
 def _iter_ts_items(ts_root: ET.Element) -> Iterable[TsItem]:
@@ -109,34 +109,25 @@ def _iter_ts_items(ts_root: ET.Element) -> Iterable[TsItem]:
     Yields:
         TsItem: message 単位の情報。
     """
-    for ctx in ts_root.findall("context"):
-        ctx_name = _text(ctx.find("name"))
-        for msg in ctx.findall("message"):
-            src = _text(msg.find("source"))
-            if not src:
-                continue
-            tr = _ensure_translation_elem(msg)
-            yield TsItem(
-                context_name=ctx_name,
-                source_text=src,
-                message_elem=msg,
-                translation_elem=tr,
-            )
-
-
-def _count_candidates(ts_root: ET.Element) -> int:
-    """翻訳候補数（source が存在する message 数）を数えます。
-
-    Args:
-        ts_root: <TS> ルート。
-
-    Returns:
-        int: 件数。
-    """
-    count = 0
-    for _ in _iter_ts_items(ts_root):
-        count += 1
-    return count
+    # context/message を 1 回の走査で辿り、context 名は親が変わった時だけ引く
+    ctx: Optional[ET.Element] = None
+    ctx_name = ""
+    for msg in ts_root.iterfind("context/message"):
+        src = _text(msg.find("source"))
+        if not src:
+            continue
+        parent = msg.getparent()
+        if parent is not ctx:
+            ctx = parent
+            # 同じ context 名を持つ TsItem が大量に並ぶので、文字列を共有させる
+            ctx_name = sys.intern(_text(ctx.find("name")))
+        tr = _ensure_translation_elem(msg)
+        yield TsItem(
+            context_name=ctx_name,
+            source_text=src,
+            message_elem=msg,
+            translation_elem=tr,
+        )
 
 
 def _ensure_extra_po_headers(ts_root: ET.Element, language: str) -> None:
@@ -150,8 +141,8 @@ def _ensure_extra_po_headers(ts_root: ET.Element, language: str) -> None:
         None
     """
     # 既にあれば何もしない。無いなら最低限を追加。
-    existing = ts_root.findall("extra-po-header")
-    if existing:
+    # 有無だけ分かればよいので、全件のリストは作らず最初の 1 件で止める
+    if ts_root.find("extra-po-header") is not None:
         return
 
     # 形式は TS によって揺れますが、Qt Linguist は extra-po-header を複数持てます。
@@ -160,64 +151,73 @@ def _ensure_extra_po_headers(ts_root: ET.Element, language: str) -> None:
     h.text = f"Language: {language}"
 
 
-def _write_failed_log(record: dict) -> None:
-    """失敗ログ（jsonl）に追記します。
+async def _drain_failed_log(queue: asyncio.Queue[Optional[bytes]]) -> None:
+    """失敗ログ（jsonl）の追記キューを処理します。
+
+    ファイルは最初の 1 行が来たときに 1 度だけ開き、キューが空になるたびに flush します。
+    None を受け取ると終了します。
 
     Args:
-        record: JSON 化可能な辞書。
+        queue: 書き込む行（UTF-8、改行込み）のキュー。
 
     Returns:
         None
     """
-    with FAILED_LOG_PATH.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    f = None
+    try:
+        while True:
+            line = await queue.get()
+            if line is None:
+                break
+            if f is None:
+                f = FAILED_LOG_PATH.open("ab")
+            f.write(line)
+            if queue.empty():
+                await asyncio.to_thread(f.flush)
+    finally:
+        if f is not None:
+            f.close()
+
+
+def _estimate_tokens(source_texts: Iterable[str]) -> int:
+    """1 リクエストの使用トークン数を概算します（TPM 制御用）。
+
+    文字数 / 4 を入力の目安とし、プロンプトと出力の分として 256 を加えます。
+
+    Args:
+        source_texts: リクエストに含める翻訳元文字列。
+
+    Returns:
+        int: 概算トークン数。
+    """
+    return sum(len(text) // 4 for text in source_texts) + 256
 
 
-def _export_phrasebook(ts_root: ET.Element, out_path: str, translator_name: str) -> int:
-    """TS からフレーズブック（QPH）を出力します。
+def _export_phrasebook(phrases: PhraseArrays, out_path: str, translator_name: str) -> int:
+    """フレーズ一覧からフレーズブック（QPH）を出力します。
 
     Args:
-        ts_root: TS ルート要素。
+        phrases: extract_phrase_arrays の結果。
         out_path: 出力パス（.qph など）。
         translator_name: 翻訳者名。
 
     Returns:
         int: 出力したエントリ数。
     """
-    phrases = extract_phrases_from_ts(ts_root)
-    qph_tree = build_qph_xml(phrases, translator_name=translator_name)
-    write_qph(qph_tree, out_path, include_doctype=True)
-    return len(phrases)
+    return write_qph_arrays(phrases, out_path, translator_name=translator_name, include_doctype=True)
 
 
 async def _run(args: argparse.Namespace) -> int:
-    # TS 読み込み
-    tree = ET.parse(args.input)
-    root = tree.getroot()
-    if root.tag != "TS":
-        raise SystemExit("Not a Qt Linguist TS file (root is not <TS>).")
-
-    # TS 属性整備
-    root.set("language", args.language)
-    _ensure_extra_po_headers(root, args.language)
-
-    total_candidates = _count_candidates(root)
-
-    # 翻訳対象収集
-    targets: list[TsItem] = []
-    already_done = 0
-    for item in _iter_ts_items(root):
-        if _should_translate(item.translation_elem):
-            targets.append(item)
-        else:
-            already_done += 1
-
-    # export-only：翻訳せず辞書/ptlだけ出す
+    # export-only：翻訳せず辞書/ptlだけ出す（TS をツリーにせずストリームで読む）
     if args.export_only:
         wrote_any = False
 
         if args.phrasebook_out:
-            n = _export_phrasebook(root, args.phrasebook_out, args.translator)
+            try:
+                phrases = extract_phrase_arrays(args.input)
+            except ValueError as exc:
+                raise SystemExit(str(exc))
+            n = _export_phrasebook(phrases, args.phrasebook_out, args.translator)
             print(f"Phrasebook written: {args.phrasebook_out} (entries={n})")
             wrote_any = True
 
@@ -233,27 +233,76 @@ async def _run(args: argparse.Namespace) -> int:
 
         return 0
 
+    # TS 読み込み（lxml は DOCTYPE も保持したまま書き戻せる）
+    # 書き戻すため空白ノードは残す（remove_blank_text=False）。xml:id の索引と実体展開は不要。
+    tree = ET.parse(
+        args.input,
+        parser=ET.XMLParser(huge_tree=True, remove_blank_text=False, collect_ids=False, resolve_entities=False),
+    )
+    root = tree.getroot()
+    if root.tag != "TS":
+        raise SystemExit("Not a Qt Linguist TS file (root is not <TS>).")
+
+    # TS 属性整備
+    root.set("language", args.language)
+    _ensure_extra_po_headers(root, args.language)
+
+    # 翻訳対象収集（候補数も同じ走査で数える）
+    targets: list[TsItem] = []
+    already_done = 0
+    for item in _iter_ts_items(root):
+        if _should_translate(item.translation_elem):
+            targets.append(item)
+        else:
+            already_done += 1
+    total_candidates = len(targets) + already_done
+
     # AOAI env（翻訳をする場合のみ必須）
-    endpoint = _load_env_required("AZURE_OPENAI_ENDPOINT")
-    api_key = _load_env_required("AZURE_OPENAI_API_KEY")
-    deployment = _load_env_required("AZURE_OPENAI_DEPLOYMENT")
+    aoai = load_azure_openai_config()
+    deployment = aoai.deployment
 
     pricing = load_pricing_config()
-    client = make_async_client(endpoint=endpoint, api_key=api_key)
+    client = make_async_client(endpoint=aoai.endpoint, api_key=aoai.api_key)
 
     # 失敗ログリセット
     if args.reset_failed_log and FAILED_LOG_PATH.exists():
         FAILED_LOG_PATH.unlink()
 
+    # 失敗ログは 1 つのタスクでまとめて追記する
+    fail_queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+    fail_drainer = asyncio.create_task(_drain_failed_log(fail_queue))
+
     reporter = ProgressReporter(total=total_candidates, every=args.progress_every)
     usage = UsageTotals()
 
     sem = asyncio.Semaphore(args.concurrency)
     lock = asyncio.Lock()
+    checkpoint_lock = asyncio.Lock()  # 途中保存ファイルへの書き込みを直列化
+
+    # 0 以下なら無制限（バケットを使わない）
+    rps_bucket = AsyncTokenBucket(args.rps, burst=max(1.0, args.rps)) if args.rps > 0 else None
+    # Azure は TPM を 10 秒単位でも評価するため、バースト上限は 1 分枠の 1/6 とする
+    tpm_bucket = AsyncTokenBucket(args.tpm / 60.0, burst=args.tpm / 6.0) if args.tpm > 0 else None
+
+    # 429/5xx が続いたら一定時間 API 呼び出しを止める（0 以下なら無効）
+    breaker = (
+        AsyncCircuitBreaker(
+            fail_threshold=args.circuit_threshold,
+            reset_sec=args.circuit_reset_sec,
+            fail_fast=args.circuit_fail_fast,
+        )
+        if args.circuit_threshold > 0
+        else None
+    )
 
     translated_count = 0
     failed_count = 0
     skipped_count = already_done  # 既に翻訳済み/対象外
+    last_checkpoint = 0  # 最後に途中保存したときの処理済み件数
+    cached_hits = 0  # 重複 source を再利用した件数
+
+    loop = asyncio.get_running_loop()
+    cache: dict[Tuple[str, str], asyncio.Future[TranslateResult]] = {}
 
     start_time = time.time()
 
@@ -262,68 +311,186 @@ async def _run(args: argparse.Namespace) -> int:
 
     target_language = f"{args.target_name} ({args.language})"
 
-    async def worker(index: int, item: TsItem) -> None:
-        nonlocal translated_count, failed_count, skipped_count
+    def apply_result(index: int, item: TsItem, result: TranslateResult) -> None:
+        nonlocal translated_count, failed_count
+
+        if result.ok:
+            item.translation_elem.text = result.text
+            item.translation_elem.attrib.pop("type", None)
+            usage.add(result.input_tokens, result.output_tokens)
+            translated_count += 1
+
+            if args.show:
+                print("-" * 80)
+                print(f"[{translated_count}] context={item.context_name}")
+                print(f"SRC: {item.source_text}")
+                print(f"TRG: {result.text}")
+        else:
+            # content_filter 等：未翻訳で残す
+            item.translation_elem.attrib["type"] = "unfinished"
+            failed_count += 1
+
+            record = {
+                "index": index,
+                "context": item.context_name,
+                "source": item.source_text,
+                "error_code": result.error_code,
+            }
+            fail_queue.put_nowait(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+
+        # 進捗：処理済み（成功+失敗）を進捗カウントにする
+        reporter.maybe_print(translated_count + failed_count, skipped_count)
+
+    async def acquire_rate(source_texts: Sequence[str]) -> None:
+        """1 リクエスト分の RPS/TPM を取得します（バケット未設定なら何もしない）。"""
+        if rps_bucket is not None:
+            await rps_bucket.acquire()
+        if tpm_bucket is not None:
+            await tpm_bucket.acquire(_estimate_tokens(source_texts))
+
+    async def translate_items(pairs: list[Tuple[int, TsItem]]) -> dict[int, TranslateResult]:
+        """流量制御と同時実行数の枠を通して、まとめて翻訳します。"""
+        # 流量制御：RPS/TPM のバケットを通してから同時実行数の枠に入る
+        await acquire_rate([item.source_text for _, item in pairs])
 
         async with sem:
-            result = await translate_one_async(
+            return await translate_batch_async(
                 client=client,
                 deployment=deployment,
-                source_text=item.source_text,
-                context_name=item.context_name,
+                items=[(index, item.context_name, item.source_text) for index, item in pairs],
                 target_language=target_language,
                 max_retries=args.max_retries,
                 timeout_sec=args.timeout_sec,
+                breaker=breaker,
+                acquire=acquire_rate,
             )
 
-        async with lock:
-            if result.ok:
-                item.translation_elem.text = result.text
-                item.translation_elem.attrib.pop("type", None)
-                usage.add(result.input_tokens, result.output_tokens)
-                translated_count += 1
-
-                if args.show:
-                    print("-" * 80)
-                    print(f"[{translated_count}] context={item.context_name}")
-                    print(f"SRC: {item.source_text}")
-                    print(f"TRG: {result.text}")
+    async def worker(chunk: list[Tuple[int, TsItem]]) -> None:
+        nonlocal last_checkpoint, cached_hits
+
+        # 同じ source は 1 度だけ翻訳する：最初に登録した worker が翻訳し、他はその結果を待つ
+        # （登録までに await を挟まないのでロックは不要）
+        keys: dict[int, Tuple[str, str]] = {}
+        produced: dict[int, asyncio.Future[TranslateResult]] = {}
+        waiting: dict[int, asyncio.Future[TranslateResult]] = {}
+        for index, item in chunk:
+            key = (item.source_text, target_language)
+            keys[index] = key
+            fut = cache.get(key)
+            if fut is None:
+                fut = loop.create_future()
+                cache[key] = fut
+                produced[index] = fut
             else:
-                # content_filter 等：未翻訳で残す
-                item.translation_elem.attrib["type"] = "unfinished"
-                failed_count += 1
-
-                _write_failed_log(
-                    {
-                        "index": index,
-                        "context": item.context_name,
-                        "source": item.source_text,
-                        "error_code": result.error_code,
-                    }
-                )
-
-            # 進捗：処理済み（成功+失敗）を進捗カウントにする
-            reporter.maybe_print(translated_count + failed_count, skipped_count)
-
-            # 途中保存
+                waiting[index] = fut
+
+        results: dict[int, TranslateResult] = {}
+        to_translate = [(index, item) for index, item in chunk if index in produced]
+        if to_translate:
+            try:
+                results = await translate_items(to_translate)
+            except BaseException as exc:
+                # 待っている worker を道連れにしない（永久に待たせない）
+                for index, fut in produced.items():
+                    cache.pop(keys[index], None)
+                    if isinstance(exc, Exception):
+                        fut.set_exception(exc)
+                    else:
+                        fut.cancel()
+                raise
+
+            for index, fut in produced.items():
+                fut.set_result(results[index])
+                # 失敗は使い回さず、後続の重複は再度翻訳させる
+                # （429 等は一時的、content_filter は context 次第で通ることもあるため）
+                if not results[index].ok:
+                    cache.pop(keys[index], None)
+
+        retry: list[Tuple[int, TsItem]] = []
+        for index, item in chunk:
+            fut = waiting.get(index)
+            if fut is None:
+                continue
+            shared = await fut
+            if shared.ok:
+                # トークンは翻訳した側で計上済み
+                results[index] = replace(shared, input_tokens=0, output_tokens=0)
+                cached_hits += 1
+            else:
+                # 待っていた翻訳が失敗した場合は使い回さず、自分で翻訳し直す
+                retry.append((index, item))
+        if retry:
+            results.update(await translate_items(retry))
+
+        checkpoint: Optional[bytes] = None
+        async with lock:
+            for index, item in chunk:
+                apply_result(index, item, results[index])
+
+            # 途中保存：前回から save_every 件以上進んだときだけ（ロック内ではメモリ上に直列化するのみ）
             processed = translated_count + failed_count
-            if args.save_every > 0 and processed % args.save_every == 0:
+            if args.save_every > 0 and processed - last_checkpoint >= args.save_every:
+                last_checkpoint = processed
+                buf = BytesIO()
+                tree.write(buf, encoding="utf-8", xml_declaration=True, pretty_print=False)
+                checkpoint = buf.getvalue()
+
+        # ファイル書き込みはロック外・別スレッドで行い、他の worker を止めない
+        if checkpoint is not None:
+            async with checkpoint_lock:
                 try:
-                    tree.write(str(partial_path), encoding="utf-8", xml_declaration=True)
+                    await asyncio.to_thread(partial_path.write_bytes, checkpoint)
                     elapsed = time.time() - start_time
                     print(f"[checkpoint] wrote {partial_path} (processed={processed}, elapsed={elapsed:.1f}s)")
                 except Exception as exc:
                     print(f"[checkpoint] failed to write partial: {exc}")
 
-    tasks = [asyncio.create_task(worker(i, item)) for i, item in enumerate(targets, start=1)]
-    await asyncio.gather(*tasks)
+    if args.batch:
+        # Batch API：全件を 1 ジョブとして投入し、完了後にまとめて反映する
+        if targets:
+            batch_id = await submit_batch(
+                client,
+                deployment,
+                [(item.context_name, item.source_text) for item in targets],
+                target_language,
+            )
+            print(f"[batch] submitted {batch_id} (items={len(targets)})")
+            await poll_batch(client, batch_id, poll_interval_sec=args.batch_poll_sec)
+            results = await fetch_results(client, batch_id)
+
+            missing = TranslateResult(ok=False, text="", input_tokens=0, output_tokens=0, error_code="batch_missing")
+            for i, item in enumerate(targets):
+                apply_result(i + 1, item, results.get(i, missing))
+    else:
+        # chunk_size 件ずつ 1 リクエストにまとめる
+        chunk_size = max(1, args.chunk_size)
+        chunks = (
+            list(enumerate(targets[i : i + chunk_size], start=i + 1))
+            for i in range(0, len(targets), chunk_size)
+        )
+
+        # Task は同時実行数の数倍だけ作り、終わった分を補充する（全件分を一度に作らない）
+        pending: set[asyncio.Task[None]] = {
+            asyncio.create_task(worker(chunk))
+            for chunk in itertools.islice(chunks, max(1, args.concurrency) * 4)
+        }
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()  # worker の例外は gather と同じくそのまま送出する
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.add(asyncio.create_task(worker(chunk)))
+
+    fail_queue.put_nowait(None)
+    await fail_drainer
 
     # 最終保存
-    tree.write(output_path, encoding="utf-8", xml_declaration=True)
+    tree.write(output_path, encoding="utf-8", xml_declaration=True, pretty_print=False)
 
     # 任意：phrasebook 出力
     if args.phrasebook_out:
-        n = _export_phrasebook(root, args.phrasebook_out, args.translator)
+        n = _export_phrasebook(extract_phrase_arrays(root), args.phrasebook_out, args.translator)
         print(f"Phrasebook written: {args.phrasebook_out} (entries={n})")
 
     # 任意：ptl 出力（TS->QM->PTL）
@@ -346,6 +513,7 @@ async def _run(args: argparse.Namespace) -> int:
     print(f"Translated: {translated_count}")
     print(f"Failed (content_filter etc.): {failed_count}  -> {FAILED_LOG_PATH}")
     print(f"Skipped (already translated / not needed): {skipped_count}")
+    print(f"Cached (duplicate source reused): {cached_hits}")
     print(f"Elapsed: {elapsed_total:.1f}s")
     print(f"Tokens: input={usage.input_tokens}, output={usage.output_tokens}")
     print(
@@ -372,12 +540,43 @@ def main() -> int:
 
     # 並列・表示
     parser.add_argument("--concurrency", type=int, default=10, help="Number of concurrent requests")
+    parser.add_argument("--rps", type=float, default=0.0, help="Max requests per second (0 = unlimited)")
+    parser.add_argument("--tpm", type=float, default=0.0, help="Max estimated tokens per minute (0 = unlimited)")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=20,
+        help="Number of messages translated per request (1 = one request per message)",
+    )
     parser.add_argument("--progress-every", type=int, default=50, help="Print progress every N processed items")
     parser.add_argument("--show", action="store_true", help="Print each translation (only successful ones)")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit all messages as one Batch API job instead of per-message requests (needs a Global Batch deployment).",
+    )
+    parser.add_argument("--batch-poll-sec", type=float, default=30.0, help="Batch job polling interval seconds")
 
     # リトライ・タイムアウト・途中保存
     parser.add_argument("--max-retries", type=int, default=6, help="Max retries for transient failures")
     parser.add_argument("--timeout-sec", type=float, default=60.0, help="Per-request timeout seconds")
+    parser.add_argument(
+        "--circuit-threshold",
+        type=int,
+        default=5,
+        help="Consecutive 429/5xx failures that open the circuit breaker (0 = disabled)",
+    )
+    parser.add_argument(
+        "--circuit-reset-sec",
+        type=float,
+        default=30.0,
+        help="Seconds the circuit stays open before a probe request is allowed",
+    )
+    parser.add_argument(
+        "--circuit-fail-fast",
+        action="store_true",
+        help="While the circuit is open, mark messages as failed (circuit_open) instead of waiting for the probe",
+    )
     parser.add_argument("--save-every", type=int, default=200, help="Write partial output every N processed items")
 
     # ログ
@@ -392,12 +591,12 @@ def main() -> int:
     parser.add_argument(
         "--ptl-out",
         default=None,
-        help="Output .ptl (binary). Generated via lrelease (TS->QM->PTL rename).",
+        help="Output .ptl (binary). Compiled with lrelease (TS->QM->PTL rename); falls back to the built-in QM writer if lrelease is not found.",
     )
     parser.add_argument(
         "--lrelease-path",
         default=None,
-        help="Path to lrelease executable. If omitted, uses QT_LRELEASE_PATH or PATH.",
+        help="Path to lrelease executable. If omitted, uses QT_LRELEASE_PATH, then lrelease on PATH, else the built-in QM writer.",
     )
     parser.add_argument(
         "--translator",
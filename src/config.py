@@ -27,9 +27,9 @@ def load_azure_openai_config() -> AzureOpenAIConfig:
     Raises:
         SystemExit: 必須環境変数が不足している場合。
     """
-    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-    api_key = os.getenv("AZURE_OPENAI_API_KEY")
-    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT", "").strip()
+    api_key = os.getenv("AZURE_OPENAI_API_KEY", "").strip()
+    deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "").strip()
 
     missing = [
         key
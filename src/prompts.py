@@ -1,6 +1,40 @@
 from __future__ import annotations
 
-from typing import Tuple
+import json
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+
+# SYSTEM プロンプト（役割と制約のみ）。呼び出しごとに組み立てず使い回す
+_ROLE_AND_FORMAT_RULES = (
+    "You are a professional software UI translator specialized in IT, networking, and software products.\n"
+    "Rules:\n"
+    "- Preserve placeholders exactly (%1, %2, %s, {0}, ${var}).\n"
+    "- Preserve XML/HTML tags.\n"
+    "- Do not add explanations.\n"
+)
+_TERMINOLOGY_RULES = (
+    "- Treat IT, networking, and security terms as technical terms.\n"
+    "- Do NOT translate technical terms literally.\n"
+    "- Use standard industry translations, or keep the original English term if commonly used in Japanese UI.\n"
+    "- Examples:\n"
+    "  - Firewall -> Firewall (or ファイアウォール)\n"
+    "  - Routing -> Routing (or ルーティング)\n"
+    "  - Packet -> Packet (or パケット)\n"
+    "  - Port -> Port (or ポート)\n"
+    "  - Interface -> Interface (or インターフェース)\n"
+    "  - Network -> Network (or ネットワーク)\n"
+    "- NEVER translate technical terms into unrelated literal meanings (e.g. Firewall must NOT become 火炎, 防火壁).\n"
+)
+_SYSTEM_PROMPT = _ROLE_AND_FORMAT_RULES + "- Output only the translated text.\n" + _TERMINOLOGY_RULES
+# まとめ翻訳用：出力ルールだけを id 付き JSON 配列に置き換える（単体用と矛盾させない）
+_BATCH_SYSTEM_PROMPT = (
+    _ROLE_AND_FORMAT_RULES
+    + '- Output only a JSON array of {"id": <id>, "translation": "<translated text>"}, '
+    "with exactly one entry per input item and the ids unchanged, without code fences.\n"
+    '- Each "translation" contains only the translated "text" of that item.\n'
+    + _TERMINOLOGY_RULES
+)
 
 
 def build_prompts(source_text: str, context_name: str, target_language: str) -> Tuple[str, str]:
@@ -17,30 +51,47 @@ def build_prompts(source_text: str, context_name: str, target_language: str) ->
     Returns:
         Tuple[str, str]: (system_prompt, user_prompt)
     """
-    system_prompt = (
-        "You are a professional software UI translator specialized in IT, networking, and software products.\n"
-        "Rules:\n"
-        "- Preserve placeholders exactly (%1, %2, %s, {0}, ${var}).\n"
-        "- Preserve XML/HTML tags.\n"
-        "- Do not add explanations.\n"
-        "- Output only the translated text.\n"
-        "- Treat IT, networking, and security terms as technical terms.\n"
-        "- Do NOT translate technical terms literally.\n"
-        "- Use standard industry translations, or keep the original English term if commonly used in Japanese UI.\n"
-        "- Examples:\n"
-        "  - Firewall -> Firewall (or ファイアウォール)\n"
-        "  - Routing -> Routing (or ルーティング)\n"
-        "  - Packet -> Packet (or パケット)\n"
-        "  - Port -> Port (or ポート)\n"
-        "  - Interface -> Interface (or インターフェース)\n"
-        "  - Network -> Network (or ネットワーク)\n"
-        "- NEVER translate technical terms into unrelated literal meanings (e.g. Firewall must NOT become 火炎, 防火壁).\n"
-    )
+    return _SYSTEM_PROMPT, _user_prefix(context_name, target_language) + source_text
+
+
+@lru_cache(maxsize=None)
+def _user_prefix(context_name: str, target_language: str) -> str:
+    """USER プロンプトの source_text より前の部分を返します。
+
+    (context, 言語) の組み合わせは context 数程度しかないため、メッセージごとに組み立てずキャッシュします。
+
+    Args:
+        context_name: Qt の context 名。
+        target_language: 翻訳先言語（例: Japanese (ja_JP)）。
+
+    Returns:
+        str: "Target language: ...\nQt context: ...\nText: "
+    """
+    return f"Target language: {target_language}\nQt context: {context_name}\nText: "
+
 
+def build_batch_prompts(items: Sequence[Tuple[int, str, str]], target_language: str) -> Tuple[str, str]:
+    """複数メッセージをまとめて翻訳するための SYSTEM/USER プロンプトを構築します。
 
+    SYSTEM は build_prompts と同じ制約で、出力ルールだけを id 付きの JSON 配列にしたものです。
+    USER で入力を JSON 配列として渡します。
+
+    Args:
+        items: (id, context_name, source_text) の一覧。
+        target_language: 翻訳先言語（例: Japanese (ja_JP)）。
+
+    Returns:
+        Tuple[str, str]: (system_prompt, user_prompt)
+    """
+    payload = json.dumps(
+        [{"id": i, "context": ctx, "text": src} for i, ctx, src in items],
+        ensure_ascii=False,
+    )
     user_prompt = (
         f"Target language: {target_language}\n"
-        f"Qt context: {context_name}\n"
-        f"Text: {source_text}"
+        "Translate the \"text\" of each item (\"context\" is the Qt context).\n"
+        'Return only a JSON array of {"id": <id>, "translation": "<translated text>"} '
+        "with one entry per item, without code fences.\n"
+        f"Input:\n{payload}"
     )
-    return system_prompt, user_prompt
+    return _BATCH_SYSTEM_PROMPT, user_prompt
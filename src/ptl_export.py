@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import functools
 import os
 import shutil
 import subprocess
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional, Sequence, Tuple
 
+from qm_writer import QmWriterUnsupported, write_qm
 
+
+@functools.lru_cache(maxsize=None)
 def _which(cmd: str) -> Optional[str]:
     """PATH から実行ファイルを探索します。
 
+    結果はキャッシュします（PATH を再探索したい場合は _which.cache_clear()）。
+
     Args:
         cmd: コマンド名。
 
@@ -19,6 +26,20 @@ def _which(cmd: str) -> Optional[str]:
     return shutil.which(cmd)
 
 
+def _resolve_lrelease(explicit: Optional[str]) -> Optional[str]:
+    """使用する lrelease 実行ファイルを決定します。
+
+    優先順: 引数 → QT_LRELEASE_PATH → PATH 上の lrelease → lrelease-qt5
+
+    Args:
+        explicit: 明示指定された lrelease 実行ファイルパス。
+
+    Returns:
+        Optional[str]: 実行ファイルパス。見つからなければ None。
+    """
+    return explicit or os.getenv("QT_LRELEASE_PATH") or _which("lrelease") or _which("lrelease-qt5")
+
+
 def compile_qm_with_lrelease(
     ts_path: str,
     qm_path: str,
@@ -44,7 +65,7 @@ def compile_qm_with_lrelease(
     if not ts.exists():
         raise RuntimeError(f"TS file not found: {ts}")
 
-    exe = (lrelease_path or os.getenv("QT_LRELEASE_PATH") or _which("lrelease") or _which("lrelease-qt5"))
+    exe = _resolve_lrelease(lrelease_path)
     if not exe:
         raise RuntimeError(
             "lrelease not found. Install Qt Linguist tools (lrelease), "
@@ -54,11 +75,13 @@ def compile_qm_with_lrelease(
     qm.parent.mkdir(parents=True, exist_ok=True)
 
     # lrelease input.ts -qm output.qm
+    # shell / preexec_fn を使わず close_fds=True のままにして、posix_spawn 経路で起動させる
     proc = subprocess.run(
         [exe, str(ts), "-qm", str(qm)],
         capture_output=True,
         text=True,
         encoding="utf-8",
+        close_fds=True,
     )
     if proc.returncode != 0:
         raise RuntimeError(
@@ -69,6 +92,39 @@ def compile_qm_with_lrelease(
         )
 
 
+def batch_compile_qm(
+    pairs: Sequence[Tuple[str, str]],
+    *,
+    lrelease_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> None:
+    """複数の TS → QM 変換を lrelease の並列実行で行います。
+
+    Args:
+        pairs: (ts_path, qm_path) の一覧。
+        lrelease_path: lrelease 実行ファイルパス（未指定なら PATH/ENV から探索）。
+        max_workers: 同時に起動する lrelease の数（未指定なら CPU 数）。
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: いずれかの変換に失敗した場合（最初に失敗したもの）。
+    """
+    if not pairs:
+        return
+
+    workers = max_workers or min(len(pairs), os.cpu_count() or 1)
+    # lrelease は別プロセスなので、スレッドは起動と待機だけを担う
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(compile_qm_with_lrelease, ts_path, qm_path, lrelease_path=lrelease_path)
+            for ts_path, qm_path in pairs
+        ]
+        for future in futures:
+            future.result()
+
+
 def export_ptl_from_ts(
     ts_path: str,
     ptl_path: str,
@@ -78,6 +134,8 @@ def export_ptl_from_ts(
     """TS から PTL（=QM相当のバイナリ）を生成します。
 
     実装は「TS→QM を lrelease で作り、QM を PTL 拡張子で保存する」です。:contentReference[oaicite:2]{index=2}
+    lrelease は 引数 → QT_LRELEASE_PATH → PATH の順で探し、見つからない場合だけ
+    組み込みの QM 生成（qm_writer）を使います。
 
     Args:
         ts_path: 入力 .ts パス。
@@ -88,18 +146,74 @@ def export_ptl_from_ts(
         str: 生成した ptl のパス。
     """
     ptl = Path(ptl_path)
-    tmp_qm = ptl.with_suffix(".qm")
-
-    compile_qm_with_lrelease(ts_path, str(tmp_qm), lrelease_path=lrelease_path)
     ptl.parent.mkdir(parents=True, exist_ok=True)
+    # 同じディレクトリの一時ファイルに出力し、rename で置き換える（コピー不要・原子的）
+    tmp_qm = ptl.with_suffix(ptl.suffix + ".qm.tmp")
 
-    # “中身は qm” を ptl として保存
-    shutil.copyfile(str(tmp_qm), str(ptl))
-
-    # tmp_qm を残したいなら消さない。デフォルトは掃除。
     try:
-        tmp_qm.unlink(missing_ok=True)  # py3.8+ OK
-    except Exception:
-        pass
+        exe = _resolve_lrelease(lrelease_path)
+        if exe:
+            compile_qm_with_lrelease(ts_path, str(tmp_qm), lrelease_path=exe)
+        else:
+            try:
+                write_qm(ts_path, tmp_qm)
+            except QmWriterUnsupported as e:
+                raise RuntimeError(
+                    f"Built-in QM writer cannot handle this TS ({e}). "
+                    "Install Qt lrelease or pass --lrelease-path / set QT_LRELEASE_PATH."
+                ) from e
+        # “中身は qm” を ptl として保存
+        os.replace(tmp_qm, ptl)
+    finally:
+        tmp_qm.unlink(missing_ok=True)
 
     return str(ptl)
+
+
+def batch_export_ptl(
+    jobs: Sequence[Tuple[str, str]],
+    *,
+    lrelease_path: Optional[str] = None,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+) -> list[str]:
+    """複数の TS から PTL を並列に生成します（ロケールごとの一括出力向け）。
+
+    lrelease があればスレッドで、無ければ組み込みの QM 生成をプロセスで並列実行します。
+
+    Args:
+        jobs: (ts_path, ptl_path) の一覧。
+        lrelease_path: lrelease 実行ファイルパス（未指定なら PATH/ENV から探索）。
+        max_workers: 同時に処理する数（未指定なら CPU 数）。
+        progress: 1 件完了するごとに (完了数, 総数, ptl のパス) で呼ばれるコールバック。
+
+    Returns:
+        list[str]: 生成した ptl のパス（jobs と同じ順）。
+
+    Raises:
+        RuntimeError: いずれかの生成に失敗した場合（最初に検出したもの）。
+    """
+    if not jobs:
+        return []
+
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    results: list[str] = [""] * len(jobs)
+    exe = _resolve_lrelease(lrelease_path)
+    pool: Executor
+    if exe:
+        # 重い処理は lrelease（別プロセス）なので、スレッドで十分
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        # 組み込みの QM 生成は純 Python（GIL を握る）なので、プロセスで並列化する
+        pool = ProcessPoolExecutor(max_workers=workers)
+    with pool:
+        futures = {
+            pool.submit(export_ptl_from_ts, ts_path, ptl_path, lrelease_path=exe): i
+            for i, (ts_path, ptl_path) in enumerate(jobs)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            ptl = future.result()
+            results[futures[future]] = ptl
+            if progress is not None:
+                progress(done, len(jobs), ptl)
+    return results
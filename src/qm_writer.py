@@ -0,0 +1,341 @@
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Optional, Union
+
+import lxml.etree as ET
+
+# QM ファイル先頭のマジック
+_QM_MAGIC = bytes.fromhex("3cb86418caef9c95cd211cbf60a1bddd")
+
+# セクションタグ
+_SECTION_HASHES = 0x42
+_SECTION_MESSAGES = 0x69
+_SECTION_NUMERUS_RULES = 0x88
+_SECTION_LANGUAGE = 0xA7
+
+# メッセージレコード内のタグ
+_TAG_END = 0x01
+_TAG_TRANSLATION = 0x03
+_TAG_SOURCE_TEXT = 0x06
+_TAG_CONTEXT = 0x07
+_TAG_COMMENT = 0x08
+
+# 長さ違いの訳（<lengthvariant>）の区切り文字
+_VARIANT_SEPARATOR = "\x9c"
+
+# null 文字列を表す長さ
+_NULL_LENGTH = 0xFFFFFFFF
+
+# 複数形ルールの区切り（Q_NEWRULE）
+_Q_NEWRULE = 0xFF
+
+# 言語ごとの複数形ルール（Qt の numerus.cpp と同じバイト列）。
+# 空のルールは「複数形なし」（常に 1 番目の訳を使う）を表します。
+_NUMERUS_RULES: tuple[tuple[bytes, tuple[str, ...]], ...] = (
+    (
+        b"",
+        (
+            "bi", "bo", "dz", "fa", "fj", "gn", "hu", "id", "ja", "jv", "ko", "ms",
+            "my", "na", "om", "su", "th", "tr", "tt", "vi", "yo", "za", "zh",
+        ),
+    ),
+    (
+        bytes.fromhex("0101"),
+        (
+            "aa", "ab", "af", "am", "as", "ay", "az", "ba", "bg", "bn", "ca", "co",
+            "da", "de", "el", "en", "eo", "es", "et", "eu", "fi", "fo", "fy", "gl",
+            "gu", "ha", "he", "hi", "ia", "ie", "it", "iw", "ka", "kk", "kl", "km",
+            "kn", "ks", "ku", "kw", "ky", "la", "lb", "lg", "ln", "lo", "mg", "ml",
+            "mn", "mr", "nb", "ne", "nl", "nn", "no", "oc", "or", "pa", "ps", "qu",
+            "rm", "rn", "rw", "sd", "si", "sn", "so", "sq", "ss", "st", "sv", "sw",
+            "ta", "te", "tg", "tk", "tn", "to", "ts", "ug", "ur", "uz", "vo", "wo",
+            "xh", "yi", "zu",
+        ),
+    ),
+    (bytes.fromhex("0301"), ("br", "fil", "fr", "hy", "pt", "ti", "tl", "wa")),
+    (bytes.fromhex("0101ff0102"), ("dv", "ga", "gv", "ik", "iu", "mi", "sa", "se", "sm")),
+    (bytes.fromhex("1101fd290bff140204fd2c0a13"), ("be", "bs", "hr", "ru", "sh", "sr", "uk")),
+    (bytes.fromhex("0101ff040204"), ("cs", "sk")),
+    (bytes.fromhex("0100ff0101ff040205ff0106"), ("cy",)),
+    (bytes.fromhex("0101ff0100fe240113"), ("ro",)),
+    (bytes.fromhex("1101fd290b"), ("is",)),
+    (bytes.fromhex("1101ff1102"), ("mk",)),
+    (bytes.fromhex("0100ff0101ff0102ff24030aff2a0b"), ("ar",)),
+    (bytes.fromhex("0101fe010bff0102fe010cff040313"), ("gd",)),
+    (bytes.fromhex("0101ff0100fe24010aff240b13"), ("mt",)),
+    (bytes.fromhex("0101ff140204fd2c0a13"), ("pl",)),
+    (bytes.fromhex("1101fd290bff0900"), ("lv",)),
+    (bytes.fromhex("1101fd290bff1900fd2c0a13"), ("lt",)),
+    (bytes.fromhex("2101ff2102ff240304"), ("sl",)),
+)
+_NUMERUS_RULES_BY_LANGUAGE = {lang: rules for rules, langs in _NUMERUS_RULES for lang in langs}
+
+# ブラジル以外のポルトガル語は英語と同じルール
+_PORTUGUESE_NON_BRAZIL_RULES = bytes.fromhex("0101")
+
+
+class QmWriterUnsupported(Exception):
+    """この TS は組み込みの QM 生成では扱えないことを示します（lrelease を使ってください）。"""
+
+
+@dataclass(frozen=True, slots=True)
+class _TsMessage:
+    """QM に必要な <message> の情報です。"""
+
+    context: str
+    source: str
+    comment: str
+    translation_type: str
+    translations: tuple[str, ...]
+    numerus: bool
+
+
+def _elf_hash(data: bytes) -> int:
+    """QTranslator と同じ ELF ハッシュを計算します（NUL で打ち切り）。
+
+    Args:
+        data: ハッシュ対象（UTF-8）。
+
+    Returns:
+        int: ハッシュ値（0 の場合は 1）。
+    """
+    h = 0
+    for c in data.split(b"\0", 1)[0]:
+        h = ((h << 4) + c) & 0xFFFFFFFF
+        g = h & 0xF0000000
+        if g:
+            h ^= g >> 24
+        h &= ~g
+    return h or 1
+
+
+def _numerus_rules(language: str) -> Optional[bytes]:
+    """TS の language 属性に対応する複数形ルールを返します。
+
+    Args:
+        language: 言語（例: ja_JP, pt_BR）。
+
+    Returns:
+        Optional[bytes]: ルール。対応表に無い言語なら None。
+    """
+    parts = language.replace("-", "_").split("_")
+    lang = parts[0].lower()
+    if lang == "pt" and len(parts) > 1 and parts[-1].upper() != "BR":
+        return _PORTUGUESE_NON_BRAZIL_RULES
+    return _NUMERUS_RULES_BY_LANGUAGE.get(lang)
+
+
+def _contents(elem: Optional[ET.Element]) -> str:
+    """要素の内容を Qt Linguist と同じ規則で取り出します（前後空白は保持）。
+
+    <byte value="..."/> は対応する 1 文字に置き換えます。
+
+    Args:
+        elem: XML要素。
+
+    Returns:
+        str: 内容（要素が無い場合は空文字）。
+
+    Raises:
+        QmWriterUnsupported: <byte> 以外の子要素を含む場合。
+    """
+    if elem is None:
+        return ""
+    parts = [elem.text or ""]
+    for child in elem:
+        if child.tag == "byte":
+            value = child.get("value") or ""
+            code = int(value[1:], 16) if value.startswith("x") else int(value or "0")
+            if code:
+                parts.append(chr(code))
+        elif isinstance(child.tag, str):
+            raise QmWriterUnsupported(f"unexpected <{child.tag}> in <{elem.tag}>")
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def _variant_contents(elem: ET.Element) -> str:
+    """<translation> / <numerusform> の内容を取り出します（長さ違いの訳は区切り文字で連結）。
+
+    Args:
+        elem: XML要素。
+
+    Returns:
+        str: 内容。
+    """
+    if elem.get("variants") != "yes":
+        return _contents(elem)
+    return _VARIANT_SEPARATOR.join(_contents(v) for v in elem.iterfind("lengthvariant"))
+
+
+def _read_message(context: str, msg: ET.Element) -> _TsMessage:
+    """<message> を読み取ります。
+
+    Args:
+        context: context 名。
+        msg: <message> 要素。
+
+    Returns:
+        _TsMessage: 読み取った内容。
+    """
+    numerus = msg.get("numerus") == "yes"
+    tr = msg.find("translation")
+    if tr is None:
+        translation_type = ""
+        translations: tuple[str, ...] = ("",)
+    else:
+        translation_type = tr.get("type") or ""
+        if numerus:
+            translations = tuple(_variant_contents(f) for f in tr.iterfind("numerusform"))
+        else:
+            translations = (_variant_contents(tr),)
+    return _TsMessage(
+        context=context,
+        source=_contents(msg.find("source")),
+        comment=_contents(msg.find("comment")),
+        translation_type=translation_type,
+        translations=translations or ("",),
+        numerus=numerus,
+    )
+
+
+def _qstring(text: str) -> bytes:
+    """QDataStream の QString 形式（長さ + UTF-16BE）に変換します。空文字は null 扱い。"""
+    if not text:
+        return struct.pack(">I", _NULL_LENGTH)
+    data = text.encode("utf-16-be")
+    return struct.pack(">I", len(data)) + data
+
+
+def _qbytearray(data: bytes) -> bytes:
+    """QDataStream の QByteArray 形式（長さ + バイト列）に変換します。"""
+    return struct.pack(">I", len(data)) + data
+
+
+def _section(tag: int, data: bytes) -> bytes:
+    """QM のセクション（タグ + 長さ + データ）を作ります。"""
+    return struct.pack(">BI", tag, len(data)) + data
+
+
+def build_qm(ts_path: Union[str, os.PathLike]) -> bytes:
+    """TS から QM（lrelease の既定設定と同じ内容）を生成します。
+
+    lrelease と同じく、obsolete / vanished と訳の無い unfinished は含めません。
+    disambiguation（<comment>）は、同じ context・source の別メッセージと区別が必要な場合だけ残します。
+
+    Args:
+        ts_path: 入力 .ts ファイルパス。
+
+    Returns:
+        bytes: QM バイナリ。
+
+    Raises:
+        RuntimeError: TS ファイルが無い、またはルート要素が <TS> でない場合。
+        QmWriterUnsupported: 組み込みの生成では扱えない TS の場合。
+    """
+    ts = Path(ts_path)
+    if not ts.exists():
+        raise RuntimeError(f"TS file not found: {ts}")
+
+    root = ET.parse(
+        str(ts),
+        parser=ET.XMLParser(huge_tree=True, collect_ids=False, resolve_entities=False),
+    ).getroot()
+    if root.tag != "TS":
+        raise RuntimeError("Not a Qt Linguist TS file (root is not <TS>).")
+
+    language = root.get("language") or ""
+    rules = _numerus_rules(language) if language else b""
+
+    ts_messages: list[_TsMessage] = []
+    for ctx in root.iterfind("context"):
+        context = _contents(ctx.find("name"))
+        for msg in ctx.iterfind("message"):
+            ts_messages.append(_read_message(context, msg))
+
+    if any(m.numerus for m in ts_messages):
+        if rules is None:
+            raise QmWriterUnsupported(f"no plural rules for language: {language}")
+        # lrelease と同じく、複数形の訳の数を言語の形の数（ルール数 + 1）に揃える
+        forms = rules.count(_Q_NEWRULE) + 2 if rules else 1
+        ts_messages = [
+            replace(m, translations=(m.translations + ("",) * forms)[:forms]) if m.numerus else m
+            for m in ts_messages
+        ]
+
+    # <comment> 無しの同じ context・source があれば、comment は省略しない（種別を問わない）
+    uncommented = {(m.context, m.source) for m in ts_messages if not m.comment}
+
+    # (context, source, comment) → 訳。重複は最初のものを採用する
+    seen: set[tuple[str, str, str]] = set()
+    messages: dict[tuple[bytes, bytes, bytes], tuple[str, ...]] = {}
+    for m in ts_messages:
+        if m.translation_type in ("obsolete", "vanished"):
+            continue
+        if m.translation_type == "unfinished" and not m.translations[0]:
+            continue
+        key = (m.context, m.source, m.comment)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        context = m.context.encode("utf-8")
+        source = m.source.encode("utf-8")
+        comment = m.comment.encode("utf-8")
+        if comment and (m.context, m.source) not in uncommented and (context, source, b"") not in messages:
+            comment = b""
+        messages.setdefault((context, source, comment), m.translations)
+
+    # メッセージは (context, source, comment) 順、ハッシュ表は (hash, offset) 順
+    message_parts: list[bytes] = []
+    offsets: list[tuple[int, int]] = []
+    pos = 0
+    for (context, source, comment), translations in sorted(messages.items()):
+        record = b"".join(
+            [bytes([_TAG_TRANSLATION]) + _qstring(t) for t in translations]
+            + [
+                bytes([_TAG_COMMENT]) + _qbytearray(comment),
+                bytes([_TAG_SOURCE_TEXT]) + _qbytearray(source),
+                bytes([_TAG_CONTEXT]) + _qbytearray(context),
+                bytes([_TAG_END]),
+            ]
+        )
+        offsets.append((_elf_hash(source + comment), pos))
+        message_parts.append(record)
+        pos += len(record)
+    offsets.sort()
+
+    out = [_QM_MAGIC]
+    if language:
+        out.append(_section(_SECTION_LANGUAGE, language.encode("utf-8")))
+    if offsets:
+        out.append(_section(_SECTION_HASHES, b"".join(struct.pack(">II", h, o) for h, o in offsets)))
+        out.append(_section(_SECTION_MESSAGES, b"".join(message_parts)))
+    if rules:
+        out.append(_section(_SECTION_NUMERUS_RULES, rules))
+    return b"".join(out)
+
+
+def write_qm(ts_path: Union[str, os.PathLike], qm_path: Union[str, os.PathLike]) -> None:
+    """TS から QM を生成してファイルに書き出します（lrelease 不要）。
+
+    Args:
+        ts_path: 入力 .ts ファイルパス。
+        qm_path: 出力 .qm ファイルパス。
+
+    Returns:
+        None
+
+    Raises:
+        RuntimeError: TS ファイルが無い、またはルート要素が <TS> でない場合。
+        QmWriterUnsupported: 組み込みの生成では扱えない TS の場合。
+    """
+    data = build_qm(ts_path)
+    qm = Path(qm_path)
+    qm.parent.mkdir(parents=True, exist_ok=True)
+    # メモリ上で完成させた QM を 1 回の write で書き出す（batch_export_ptl のワーカープロセスからも同じ）
+    qm.write_bytes(data)
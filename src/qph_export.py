@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import datetime as dt
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Iterable, Optional
-import xml.etree.ElementTree as ET
+from typing import Callable, Iterable, Iterator, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape
 
+import lxml.etree as ET
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class Phrase:
     """フレーズブック用の 1 エントリです。"""
 
@@ -15,6 +20,16 @@ class Phrase:
     definition: Optional[str] = None
 
 
+# フレーズブック書き出し時のバッファサイズ（小さな write をまとめて syscall を減らす）
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# lxml と同じく CR は文字参照にする（そのままだとパース時に LF へ正規化されるため）
+_ESCAPE_ENTITIES = {"\r": "&#13;"}
+
+# extract_phrase_arrays の戻り値: (sources, targets, definitions)
+PhraseArrays = Tuple[list[str], list[str], list[Optional[str]]]
+
+
 def _text(elem: Optional[ET.Element]) -> str:
     """XML要素のテキストを安全に取得します。
 
@@ -29,7 +44,7 @@ def _text(elem: Optional[ET.Element]) -> str:
     return (elem.text or "").strip()
 
 
-def extract_phrases_from_ts(ts_root: ET.Element) -> list[Phrase]:
+def extract_phrases_from_ts(ts_root: Union[ET.Element, str, os.PathLike]) -> list[Phrase]:
     """TS(XML)から翻訳済みフレーズを抽出します。
 
     方針:
@@ -38,26 +53,127 @@ def extract_phrases_from_ts(ts_root: ET.Element) -> list[Phrase]:
     - 定義（definition）は context 名を入れます（Qt Linguist上で手掛かりになるため）
 
     Args:
-        ts_root: TS のルート要素（<TS>）。
+        ts_root: TS のルート要素（<TS>）、または TS ファイルパス。
+            パスの場合はツリー全体を構築せず、<context> 単位でストリーム処理します。
 
     Returns:
         list[Phrase]: 抽出したフレーズ一覧。
+
+    Raises:
+        ValueError: パス指定でルート要素が <TS> でない場合。
+    """
+    return _phrases_from_arrays(extract_phrase_arrays(ts_root))
+
+
+def extract_phrase_arrays(ts_root: Union[ET.Element, str, os.PathLike]) -> PhraseArrays:
+    """TS から翻訳済みフレーズを列ごとの配列（sources, targets, definitions）で抽出します。
+
+    抽出ルールは extract_phrases_from_ts と同じです。
+    Phrase をエントリごとに作らないため、一括出力（write_qph_arrays）向けです。
+
+    Args:
+        ts_root: TS のルート要素（<TS>）、または TS ファイルパス。
+            パスの場合は iterparse でストリーム処理します。
+
+    Returns:
+        PhraseArrays: 同じ長さの (sources, targets, definitions)。
+
+    Raises:
+        ValueError: パス指定で、ルート要素が <TS> でない場合。
+    """
+    if isinstance(ts_root, (str, os.PathLike)):
+        contexts: Iterable[ET.Element] = _iter_contexts_from_file(ts_root)
+    else:
+        contexts = ts_root.iterfind("context")
+
+    arrays: PhraseArrays = ([], [], [])
+    for ctx in contexts:
+        _extract_phrase_arrays_from_context(ctx, arrays)
+    return arrays
+
+
+def _iter_contexts_from_file(ts_path: Union[str, os.PathLike]) -> Iterator[ET.Element]:
+    """TS ファイルの <TS> 直下の <context> を iterparse で順に返します。
+
+    呼び出し側が次を要求した時点で、返した context（と先行する兄弟要素）を破棄します。
+
+    Args:
+        ts_path: TS ファイルパス。
+
+    Yields:
+        ET.Element: <context> 要素。
+
+    Raises:
+        ValueError: ルート要素が <TS> でない場合。
     """
-    phrases: list[Phrase] = []
-    for ctx in ts_root.findall("context"):
-        ctx_name = _text(ctx.find("name"))
-        for msg in ctx.findall("message"):
-            src = _text(msg.find("source"))
-            tr = msg.find("translation")
-            if not src or tr is None:
-                continue
-            if tr.get("type") == "unfinished":
-                continue
-            trg = _text(tr)
-            if not trg:
-                continue
-            phrases.append(Phrase(source=src, target=trg, definition=ctx_name or None))
-    return phrases
+    # 読み取り専用なので要素間の空白ノードは捨て、xml:id の索引や実体展開も行わない
+    context_iter = ET.iterparse(
+        ts_path,
+        events=("end",),
+        tag="context",
+        huge_tree=True,
+        remove_blank_text=True,
+        collect_ids=False,
+        resolve_entities=False,
+    )
+    for _, ctx in context_iter:
+        root = ctx.getroottree().getroot()
+        if root.tag != "TS":
+            raise ValueError("Not a Qt Linguist TS file (root is not <TS>).")
+        parent = ctx.getparent()
+        if parent is not root:
+            continue  # ツリー版と同じく <TS> 直下の context のみ対象
+
+        yield ctx
+        # 処理済みの context を解放する（先行する兄弟要素も含めて）
+        ctx.clear()
+        while ctx.getprevious() is not None:
+            del parent[0]
+
+    # context を 1 つも含まないファイル（例: <foo/>）はループ内で判定できないため、ここで確認する
+    if context_iter.root is None or context_iter.root.tag != "TS":
+        raise ValueError("Not a Qt Linguist TS file (root is not <TS>).")
+
+
+def _extract_phrase_arrays_from_context(ctx: ET.Element, arrays: PhraseArrays) -> None:
+    """<context> 1 つ分の翻訳済みフレーズを arrays に追加します。
+
+    Args:
+        ctx: <context> 要素。
+        arrays: 追加先の (sources, targets, definitions)。
+
+    Returns:
+        None
+    """
+    sources, targets, definitions = arrays
+    # 各エントリが同じ context 名を持つので、文字列を共有させる
+    ctx_name = sys.intern(_text(ctx.find("name"))) or None
+    for msg in ctx.iterfind("message"):
+        # 安い判定（translation の有無・type）を先に行い、未翻訳なら文字列を作らない
+        tr = msg.find("translation")
+        if tr is None or tr.get("type") == "unfinished":
+            continue
+        trg = _text(tr)
+        if not trg:
+            continue
+        src = _text(msg.find("source"))
+        if not src:
+            continue
+        sources.append(src)
+        targets.append(trg)
+        definitions.append(ctx_name)
+
+
+def _phrases_from_arrays(arrays: PhraseArrays) -> list[Phrase]:
+    """列ごとの配列を Phrase の一覧に変換します。
+
+    Args:
+        arrays: extract_phrase_arrays の結果。
+
+    Returns:
+        list[Phrase]: フレーズ一覧。
+    """
+    return [Phrase(source=s, target=t, definition=d) for s, t, d in zip(*arrays)]
 
 
 def build_qph_xml(
@@ -106,12 +222,157 @@ def write_qph(tree: ET.ElementTree, out_path: str, *, include_doctype: bool = Tr
     Returns:
         None
     """
-    xml_bytes = ET.tostring(tree.getroot(), encoding="utf-8")
-    xml_decl = b'<?xml version="1.0" encoding="utf-8"?>\n'
-    doctype = b"<!DOCTYPE QPH>\n" if include_doctype else b""
-    with open(out_path, "wb") as f:
-        f.write(xml_decl)
-        f.write(doctype)
-        f.write(xml_bytes)
+    # 全体を bytes にしてから書くとツリー + シリアライズ結果でメモリが倍になるため、
+    # ファイルへ直接シリアライズする
+    with open(out_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+        if include_doctype:
+            f.write(b"<!DOCTYPE QPH>\n")
+        tree.write(f, encoding="utf-8", xml_declaration=False)
         f.write(b"\n")
 
+
+def write_qph_fast(
+    phrases: Iterable[Phrase],
+    out_path: str,
+    *,
+    translator_name: str,
+    include_doctype: bool = True,
+) -> int:
+    """フレーズ一覧から QPH を直接書き出します（XML ツリーを構築しません）。
+
+    出力は build_qph_xml + write_qph と同じ内容です。
+    QPH のスキーマは小さく固定なので、要素を作らず文字列テンプレートで書き出します。
+
+    Args:
+        phrases: フレーズ一覧。
+        out_path: 出力パス（.qph または .ppl など）。
+        translator_name: 翻訳者名（例: YUMA OBATA）。
+        include_doctype: 先頭に <!DOCTYPE QPH> を付与するか。
+
+    Returns:
+        int: 書き出したフレーズ数。
+    """
+    return _write_qph_rows(
+        ((p.source, p.target, p.definition) for p in phrases),
+        out_path,
+        translator_name=translator_name,
+        include_doctype=include_doctype,
+    )
+
+
+def write_qph_arrays(
+    arrays: PhraseArrays,
+    out_path: str,
+    *,
+    translator_name: str,
+    include_doctype: bool = True,
+) -> int:
+    """extract_phrase_arrays の結果から QPH を直接書き出します。
+
+    出力は write_qph_fast と同じ内容です。
+
+    Args:
+        arrays: (sources, targets, definitions)。
+        out_path: 出力パス（.qph または .ppl など）。
+        translator_name: 翻訳者名（例: YUMA OBATA）。
+        include_doctype: 先頭に <!DOCTYPE QPH> を付与するか。
+
+    Returns:
+        int: 書き出したフレーズ数。
+    """
+    return _write_qph_rows(
+        zip(*arrays),
+        out_path,
+        translator_name=translator_name,
+        include_doctype=include_doctype,
+    )
+
+
+def batch_export_qph(
+    jobs: Sequence[Tuple[str, str]],
+    *,
+    translator_name: str,
+    include_doctype: bool = True,
+    max_workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int, str], None]] = None,
+) -> list[int]:
+    """複数の TS からフレーズブック（QPH）を並列に出力します。
+
+    TS のパースは lxml（C 実装）で行われるため、スレッドで並列化します。
+
+    Args:
+        jobs: (ts_path, qph_path) の一覧。
+        translator_name: 翻訳者名（例: YUMA OBATA）。
+        include_doctype: 先頭に <!DOCTYPE QPH> を付与するか。
+        max_workers: 同時に処理する数（未指定なら CPU 数）。
+        progress: 1 件完了するごとに (完了数, 総数, qph のパス) で呼ばれるコールバック。
+
+    Returns:
+        list[int]: 書き出したフレーズ数（jobs と同じ順）。
+
+    Raises:
+        ValueError: いずれかの入力のルート要素が <TS> でない場合。
+    """
+    if not jobs:
+        return []
+
+    def export_one(ts_path: str, qph_path: str) -> int:
+        return write_qph_arrays(
+            extract_phrase_arrays(ts_path),
+            qph_path,
+            translator_name=translator_name,
+            include_doctype=include_doctype,
+        )
+
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    results: list[int] = [0] * len(jobs)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(export_one, ts_path, qph_path): i for i, (ts_path, qph_path) in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            results[i] = future.result()
+            if progress is not None:
+                progress(done, len(jobs), jobs[i][1])
+    return results
+
+
+def _write_qph_rows(
+    rows: Iterable[Tuple[str, str, Optional[str]]],
+    out_path: str,
+    *,
+    translator_name: str,
+    include_doctype: bool,
+) -> int:
+    """(source, target, definition) の並びを QPH として書き出します。
+
+    Args:
+        rows: (source, target, definition) の並び。
+        out_path: 出力パス。
+        translator_name: 翻訳者名。
+        include_doctype: 先頭に <!DOCTYPE QPH> を付与するか。
+
+    Returns:
+        int: 書き出したフレーズ数。
+    """
+    created = dt.datetime.now(dt.timezone.utc).isoformat()
+    count = 0
+    with open(out_path, "wb", buffering=_WRITE_BUFFER_SIZE) as f:
+        f.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+        if include_doctype:
+            f.write(b"<!DOCTYPE QPH>\n")
+        f.write(
+            f"<QPH><meta><created>{escape(created)}</created>"
+            f"<translator>{escape(translator_name, _ESCAPE_ENTITIES)}</translator></meta>".encode("utf-8")
+        )
+        for source, target, definition in rows:
+            definition_xml = (
+                f"<definition>{escape(definition, _ESCAPE_ENTITIES)}</definition>" if definition else ""
+            )
+            f.write(
+                f"<phrase><source>{escape(source, _ESCAPE_ENTITIES)}</source>"
+                f"<target>{escape(target, _ESCAPE_ENTITIES)}</target>{definition_xml}</phrase>".encode("utf-8")
+            )
+            count += 1
+        f.write(b"</QPH>\n")
+    return count
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """時間ベースのトークンバケット（非同期）です。
+
+    rate_per_sec の速度でトークンが補充され、最大 burst まで貯まります。
+    acquire は先にトークンを予約（不足分は負債として計上）し、
+    負債が解消される時刻まで待機します。そのため burst を超える要求も受け付けます。
+    """
+
+    def __init__(self, rate_per_sec: float, burst: float) -> None:
+        """バケットを初期化します（満タンの状態から開始）。
+
+        Args:
+            rate_per_sec: 1 秒あたりの補充量（> 0）。
+            burst: バケットの容量（> 0）。
+
+        Raises:
+            ValueError: rate_per_sec または burst が 0 以下の場合。
+        """
+        if rate_per_sec <= 0 or burst <= 0:
+            raise ValueError("rate_per_sec and burst must be positive")
+        self.rate_per_sec = rate_per_sec
+        self.burst = burst
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """経過時間ぶんトークンを補充します。"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate_per_sec)
+        self.last_refill = now
+
+    async def acquire(self, n: float = 1) -> None:
+        """n トークンを取得します（不足していれば補充されるまで待機）。
+
+        Args:
+            n: 必要なトークン数。
+
+        Returns:
+            None
+        """
+        async with self._lock:
+            self._refill()
+            self.tokens -= n
+            deficit = -self.tokens
+
+        if deficit > 0:
+            await asyncio.sleep(deficit / self.rate_per_sec)